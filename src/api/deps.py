@@ -20,7 +20,7 @@ from src.core.auth import (
     decode_access_token,
     is_token_blacklisted,
 )
-from src.core.config import Settings, get_settings
+from src.core.config import get_settings
 import src.models
 from src.models.user import RoleEnum, User
 
@@ -51,15 +51,8 @@ async def get_session() -> AsyncGenerator[AsyncSession]:
             raise
 
 
-def get_settings_dep() -> Settings:
-    """获取配置实例依赖。
-
-    用于 FastAPI 的 Depends 注入，返回应用配置实例。
-
-    Returns:
-        Settings: 应用配置实例
-    """
-    return get_settings()
+# 配置实例依赖：直接复用带 lru_cache 的 get_settings，省去一层包装调用
+get_settings_dep = get_settings
 
 
 async def get_current_user(
@@ -31,6 +31,7 @@ from src.models import close_db, init_db
 from src.storage.chroma_client import chroma_client
 from src.storage.minio_client import minio_client
 from src.storage.redis_client import redis_client
+from src.utils.embedding import get_embedding_service
 
 
 @asynccontextmanager
@@ -51,15 +52,23 @@ async def lifespan(app: FastAPI):
     logger.info("应用启动中...")
 
     # 初始化数据库连接
-    init_db(settings.mysql.dsn)
+    init_db(
+        settings.mysql.dsn,
+        pool_size=settings.mysql.pool_size,
+        max_overflow=settings.mysql.max_overflow,
+    )
     logger.success("数据库连接初始化完成")
 
+    # 预先创建 Embedding 服务单例，避免首个请求承担初始化开销
+    get_embedding_service()
+
     yield
 
     # 关闭时清理资源
     logger.info("应用关闭中...")
     await close_db()
     await redis_client.close()
+    await get_embedding_service().close()
     logger.success("应用资源已释放")
 
 
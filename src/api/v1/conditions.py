@@ -12,8 +12,9 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from loguru import logger
-from sqlalchemy import func, select
+from sqlalchemy import func, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 
 from src.api.deps import CurrentUser, get_session
 from src.models.condition import ScreeningCondition, StatusEnum
@@ -31,6 +32,26 @@ from src.services.nlp_parser import nlp_parser
 router = APIRouter(prefix="/conditions", tags=["筛选条件管理"])
 
 
+def _select_active_condition(condition_id: str) -> StatementLambdaElement:
+    """构建按 ID 查询未删除筛选条件的语句。
+
+    使用 lambda_stmt 缓存语句结构，condition_id 作为绑定参数传入，
+    避免每次请求重复构建和编译 select。
+
+    Args:
+        condition_id: 条件 ID
+
+    Returns:
+        StatementLambdaElement: 可直接执行的查询语句
+    """
+    return lambda_stmt(
+        lambda: select(ScreeningCondition).where(
+            ScreeningCondition.id == condition_id,
+            ScreeningCondition.status != StatusEnum.DELETED,
+        )
+    )
+
+
 def _map_to_response(condition: ScreeningCondition) -> ConditionResponse:
     """将数据库模型映射为响应模型。
 
@@ -137,12 +158,7 @@ async def update_condition(
 
     try:
         # 查询条件
-        result = await session.execute(
-            select(ScreeningCondition).where(
-                ScreeningCondition.id == condition_id,
-                ScreeningCondition.status != StatusEnum.DELETED,
-            )
-        )
+        result = await session.execute(_select_active_condition(condition_id))
         condition = result.scalar_one_or_none()
 
         if condition is None:
@@ -216,12 +232,7 @@ async def delete_condition(
 
     try:
         # 查询条件
-        result = await session.execute(
-            select(ScreeningCondition).where(
-                ScreeningCondition.id == condition_id,
-                ScreeningCondition.status != StatusEnum.DELETED,
-            )
-        )
+        result = await session.execute(_select_active_condition(condition_id))
         condition = result.scalar_one_or_none()
 
         if condition is None:
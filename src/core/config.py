@@ -27,6 +27,8 @@ class MySQLSettings(BaseSettings):
         user: 数据库用户名
         password: 数据库密码
         database: 数据库名称
+        pool_size: 连接池常驻连接数
+        max_overflow: 连接池允许的溢出连接数
     """
 
     model_config = SettingsConfigDict(
@@ -42,6 +44,8 @@ class MySQLSettings(BaseSettings):
     password: str = Field(default="", description="MySQL 密码")
     database: str = Field(default="resume_screening", description="数据库名称")
     use_sqlite: bool = Field(default=False, description="是否使用 SQLite（仅用于开发/测试）")
+    pool_size: int = Field(default=20, description="连接池常驻连接数")
+    max_overflow: int = Field(default=80, description="连接池允许的溢出连接数")
 
     @property
     def dsn(self) -> str:
@@ -168,6 +172,8 @@ class DashScopeSettings(BaseSettings):
         api_key: API 密钥
         base_url: API 基础 URL
         embedding_model: Embedding 模型名称
+        query_batch_window_ms: 查询向量化合并窗口（毫秒）
+        cache_size: 向量缓存最大条目数
     """
 
     model_config = SettingsConfigDict(
@@ -183,6 +189,11 @@ class DashScopeSettings(BaseSettings):
         description="API 基础 URL",
     )
     embedding_model: str = Field(default="text-embedding-v3", description="Embedding 模型名称")
+    query_batch_window_ms: int = Field(
+        default=5,
+        description="查询向量化合并窗口（毫秒），窗口内的并发查询合并为一次 API 调用",
+    )
+    cache_size: int = Field(default=1000, description="向量缓存最大条目数，0 表示禁用缓存")
 
 
 class AppSettings(BaseSettings):
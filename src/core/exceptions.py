@@ -37,6 +37,8 @@ class BaseAppException(Exception):
         self.code = code
         self.message = message
         self.details = details or {}
+        # 字符串表示在日志、重试等路径中会被反复格式化，构造时预先生成
+        self._str = f"[{code}] {message}"
 
     def to_dict(self) -> dict[str, Any]:
         """将异常转换为字典格式。
@@ -56,7 +58,7 @@ class BaseAppException(Exception):
         Returns:
             异常字符串
         """
-        return f"[{self.code}] {self.message}"
+        return self._str
 
 
 class StorageException(BaseAppException):
@@ -197,7 +199,7 @@ class ValidationException(BaseAppException):
         if field:
             error_details["field"] = field
         if value is not None:
-            error_details["value"] = str(value)
+            error_details["value"] = value if type(value) is str else str(value)
 
         super().__init__(
             message=message,
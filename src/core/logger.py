@@ -7,9 +7,11 @@
 - 完整异常堆栈追踪
 """
 
-import json
 from datetime import datetime
+from enum import Enum
+import json
 from pathlib import Path
+import re
 import sys
 from typing import TYPE_CHECKING, Any, TextIO
 
@@ -17,9 +19,31 @@ from loguru import logger
 
 from src.core.config import get_settings
 
+# orjson 由 chromadb/langsmith 间接安装，缺失时回退到标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 if TYPE_CHECKING:
     from loguru import Record, Message
 
+# 控制台日志级别对应的颜色标签
+_LEVEL_COLORS: dict[str, str] = {
+    "TRACE": "<dim>",
+    "DEBUG": "<cyan>",
+    "INFO": "<green>",
+    "SUCCESS": "<green><bold>",
+    "WARNING": "<yellow>",
+    "ERROR": "<red>",
+    "CRITICAL": "<red><bold>",
+}
+
+# 控制台消息清理用的正则
+_ANSI_ESCAPE_RE = re.compile(r"\x1b\[[0-9;]*[a-zA-Z]")
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 def json_serializer(obj: Any) -> Any:
     """JSON 序列化辅助函数。
@@ -36,6 +60,9 @@ def json_serializer(obj: Any) -> Any:
         return obj.isoformat()
     if isinstance(obj, Path):
         return str(obj)
+    if isinstance(obj, Enum):
+        # 与 orjson 的原生编码保持一致，输出枚举值
+        return obj.value
     if hasattr(obj, "__dict__"):
         return obj.__dict__
     return str(obj)
@@ -71,6 +98,15 @@ def format_json_record(record: "Record") -> str:
             "traceback": record["exception"].traceback if record["exception"].traceback else None,
         }
 
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                log_data, default=json_serializer, option=orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except TypeError:
+            # orjson 不支持的数据（如超过 64 位的整数）回退到标准库
+            pass
+
     return json.dumps(log_data, ensure_ascii=False, default=json_serializer)
 
 
@@ -121,17 +157,7 @@ def console_format(record: "Record") -> str:
     Returns:
         格式化的日志字符串
     """
-    level_colors = {
-        "TRACE": "<dim>",
-        "DEBUG": "<cyan>",
-        "INFO": "<green>",
-        "SUCCESS": "<green><bold>",
-        "WARNING": "<yellow>",
-        "ERROR": "<red>",
-        "CRITICAL": "<red><bold>",
-    }
-
-    color = level_colors.get(record["level"].name, "")
+    color = _LEVEL_COLORS.get(record["level"].name, "")
     end_color = "</>" * color.count("<") if color else ""
 
     time_str = "<cyan>{time:YYYY-MM-DD HH:mm:ss}</cyan>"
@@ -158,12 +184,10 @@ def sanitize_message(message: str) -> str:
     Returns:
         str: 清理后的消息
     """
-    import re
-
-    message = re.sub(r"\x1b\[[0-9;]*[a-zA-Z]", "", message)
-    message = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]", "", message)
+    message = _ANSI_ESCAPE_RE.sub("", message)
+    message = _CONTROL_CHARS_RE.sub("", message)
     message = message.replace("\r\n", " ").replace("\r", " ").replace("\n", " ")
-    message = re.sub(r"\s+", " ", message)
+    message = _WHITESPACE_RE.sub(" ", message)
 
     return message.strip()
 
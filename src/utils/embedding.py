@@ -2,14 +2,34 @@
 
 使用 DashScope Embedding API 进行文本向量化，
 支持批量文本处理和单个查询向量化。
+并发的单个查询会在短暂窗口内合并为一次批量调用，
+向量按文本内容哈希做 LRU 缓存。
 """
 
+from array import array
+import asyncio
+from collections import OrderedDict
+import contextlib
+from functools import lru_cache
+import hashlib
+from typing import Any
+
 import httpx
 from loguru import logger
 
 from src.core.config import get_settings
 from src.core.exceptions import LLMException
 
+# DashScope Embedding API 单次请求的最大文本数
+EMBEDDING_BATCH_SIZE = 20
+
+# 批量向量化时同时进行的 API 请求数上限
+EMBEDDING_MAX_CONCURRENCY = 4
+
+# 网络异常重试的退避时间（秒）
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 2.0
+
 
 class EmbeddingService:
     """Embedding 服务类。
@@ -33,10 +53,117 @@ class EmbeddingService:
         self._api_key = settings.dashscope.api_key
         self._base_url = settings.dashscope.base_url.rstrip("/")
         self._timeout = settings.app.llm_timeout
+        self._max_retries = settings.app.llm_max_retries
+        self._query_batch_window = settings.dashscope.query_batch_window_ms / 1000
+
+        # 等待合并的查询及其结果 Future
+        self._pending_queries: list[tuple[str, asyncio.Future[list[float]]]] = []
+        # 当前批次的“已满”信号，为 None 表示没有正在收集的批次
+        self._batch_full: asyncio.Event | None = None
+        # 持有刷新任务的强引用，防止任务在执行中被回收
+        self._flush_tasks: set[asyncio.Task[None]] = set()
+
+        # 向量 LRU 缓存：文本内容摘要 -> 向量
+        # 以 array('d') 紧凑存储，内存约为 list[float] 的 1/4，且数值无损
+        self._cache_size = settings.dashscope.cache_size
+        self._cache: OrderedDict[bytes, array[float]] = OrderedDict()
+
+        # 长连接 HTTP 客户端（首次调用时创建），复用 TCP/TLS 连接
+        self._http_client: httpx.AsyncClient | None = None
 
         if not self._api_key:
             logger.warning("DashScope API Key 未配置，Embedding 服务将不可用")
 
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """计算文本的缓存键。
+
+        Args:
+            text: 文本内容
+
+        Returns:
+            文本内容的 16 字节 BLAKE2b 摘要
+        """
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def _cache_get(self, key: bytes) -> list[float] | None:
+        """读取缓存向量，命中时将其标记为最近使用。
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存向量的列表副本，未命中返回 None
+        """
+        vector = self._cache.get(key)
+        if vector is None:
+            return None
+        self._cache.move_to_end(key)
+        return vector.tolist()
+
+    def _cache_put(self, key: bytes, vector: list[float]) -> None:
+        """写入缓存向量，超出容量时淘汰最久未使用的条目。
+
+        Args:
+            key: 缓存键
+            vector: 向量
+        """
+        if self._cache_size <= 0:
+            return
+        self._cache[key] = array("d", vector)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """获取共享的 HTTP 客户端，不存在或已关闭时重新创建。
+
+        Returns:
+            httpx.AsyncClient 实例
+        """
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                base_url=self._base_url,
+                headers={"Authorization": f"Bearer {self._api_key}"},
+                timeout=self._timeout,
+                limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            )
+        return self._http_client
+
+    async def close(self) -> None:
+        """关闭共享的 HTTP 客户端，释放连接池。"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def _post_with_retry(self, payload: dict[str, Any]) -> httpx.Response:
+        """发送 Embedding 请求，网络异常或超时时按指数退避重试。
+
+        Args:
+            payload: 请求体
+
+        Returns:
+            成功的 HTTP 响应
+
+        Raises:
+            httpx.HTTPError: 重试耗尽或遇到不可重试的错误
+        """
+        attempt = 0
+        while True:
+            try:
+                response = await self._get_http_client().post("/embeddings", json=payload)
+                response.raise_for_status()
+                return response
+            except (httpx.TimeoutException, httpx.NetworkError) as e:
+                if attempt >= self._max_retries:
+                    raise
+                delay = min(RETRY_BASE_DELAY * 2**attempt, RETRY_MAX_DELAY)
+                attempt += 1
+                logger.warning(
+                    f"Embedding API 网络异常，{delay:.1f}s 后重试 ({attempt}/{self._max_retries}): {e}"
+                )
+                await asyncio.sleep(delay)
+
     async def _call_embedding_api(
         self,
         texts: list[str],
@@ -59,24 +186,16 @@ class EmbeddingService:
                 model=self._model,
             )
 
-        url = f"{self._base_url}/embeddings"
-        headers = {
-            "Authorization": f"Bearer {self._api_key}",
-            "Content-Type": "application/json",
-        }
         payload = {
             "model": self._model,
             "input": texts,
         }
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                data = response.json()
+            response = await self._post_with_retry(payload)
+            data = response.json()
 
             vectors = [item["embedding"] for item in data["data"]]
-            return vectors
 
         except httpx.HTTPStatusError as e:
             error_detail = ""
@@ -101,6 +220,132 @@ class EmbeddingService:
                 model=self._model,
             ) from e
 
+        if len(vectors) != len(texts):
+            raise LLMException(
+                message=f"Embedding 返回向量数量不匹配: 期望 {len(texts)}，实际 {len(vectors)}",
+                provider="dashscope",
+                model=self._model,
+                details={"expected": len(texts), "actual": len(vectors)},
+            )
+        return vectors
+
+    async def _embed_in_batches(self, texts: list[str]) -> list[list[float]]:
+        """按 API 单次批量上限分批，并发调用 Embedding API。
+
+        同时进行的请求数不超过 EMBEDDING_MAX_CONCURRENCY；
+        任一批次失败时取消其余批次，不再继续请求 API。
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            向量列表，顺序与输入一致
+
+        Raises:
+            LLMException: API 调用失败
+        """
+        batches = [
+            texts[i : i + EMBEDDING_BATCH_SIZE] for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+        ]
+        if len(batches) == 1:
+            return await self._call_embedding_api(batches[0])
+
+        semaphore = asyncio.Semaphore(EMBEDDING_MAX_CONCURRENCY)
+
+        async def call_batch(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._call_embedding_api(batch)
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(call_batch(batch)) for batch in batches]
+        except ExceptionGroup as eg:
+            # 抛出首个批次的原始异常（LLMException），保留其异常链
+            raise eg.exceptions[0]  # noqa: B904
+        return [vector for task in tasks for vector in task.result()]
+
+    async def _coalesce_query(self, query: str) -> list[float]:
+        """将查询加入合并批次并等待其向量结果。
+
+        合并窗口内第一个到达的查询负责调度一次批量调用，
+        之后到达的查询只登记 Future 等待结果；
+        批次达到 API 单次上限时立即刷新，不再等待窗口结束。
+
+        Args:
+            query: 查询文本
+
+        Returns:
+            查询向量
+
+        Raises:
+            LLMException: 批量调用失败
+        """
+        future: asyncio.Future[list[float]] = asyncio.get_running_loop().create_future()
+        self._pending_queries.append((query, future))
+
+        if self._batch_full is None:
+            self._batch_full = asyncio.Event()
+            task = asyncio.create_task(self._flush_pending_queries(self._batch_full))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+        elif len(self._pending_queries) >= EMBEDDING_BATCH_SIZE:
+            self._batch_full.set()
+
+        return await future
+
+    async def _flush_pending_queries(self, batch_full: asyncio.Event) -> None:
+        """等待合并窗口结束或批次已满，将积压的查询合并为一次批量调用并分发结果。
+
+        Args:
+            batch_full: 当前批次的已满信号
+        """
+        with contextlib.suppress(TimeoutError):
+            await asyncio.wait_for(batch_full.wait(), self._query_batch_window)
+
+        # 先取走批次再发起调用，调用期间到达的查询会开启新的批次
+        batch, self._pending_queries = self._pending_queries, []
+        self._batch_full = None
+        if not batch:
+            return
+
+        logger.debug(f"合并查询向量化: query_count={len(batch)}")
+
+        # 同一批次内的重复查询只请求一次
+        queries = list(dict.fromkeys(query for query, _ in batch))
+        try:
+            vectors = await self._embed_in_batches(queries)
+            if len(vectors) != len(queries):
+                raise LLMException(
+                    message=(
+                        f"Embedding 返回向量数量不匹配: 期望 {len(queries)}，实际 {len(vectors)}"
+                    ),
+                    provider="dashscope",
+                    model=self._model,
+                )
+
+            vectors_by_query = dict(zip(queries, vectors, strict=True))
+            delivered: set[str] = set()
+            for query, future in batch:
+                if future.done():
+                    continue
+                vector = vectors_by_query[query]
+                # 重复查询各自拿到独立的列表，避免调用方相互修改
+                future.set_result(list(vector) if query in delivered else vector)
+                delivered.add(query)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # 刷新任务被取消时，也不能让等待中的查询永远挂起
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(
+                        LLMException(
+                            message="查询向量化已取消", provider="dashscope", model=self._model
+                        )
+                    )
+
     async def embed_texts(self, texts: list[str]) -> list[list[float]]:
         """批量文本向量化。
 
@@ -122,15 +367,37 @@ class EmbeddingService:
         try:
             logger.info(f"开始批量向量化: text_count={len(texts)}")
 
-            batch_size = 20
+            # 按内容摘要去重，缓存命中的文本不再请求 API
+            keys = [self._cache_key(text) for text in texts]
+            vectors_by_key: dict[bytes, list[float]] = {}
+            missing: dict[bytes, str] = {}
+
+            for key, text in zip(keys, texts):
+                if key in vectors_by_key or key in missing:
+                    continue
+                cached = self._cache_get(key)
+                if cached is None:
+                    missing[key] = text
+                else:
+                    vectors_by_key[key] = cached
+
+            if missing:
+                vectors = await self._embed_in_batches(list(missing.values()))
+                for key, vector in zip(missing, vectors, strict=True):
+                    vectors_by_key[key] = vector
+                    self._cache_put(key, vector)
+
+            # 重复文本各自拿到独立的列表，避免调用方相互修改
             all_vectors: list[list[float]] = []
-
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i : i + batch_size]
-                vectors = await self._call_embedding_api(batch)
-                all_vectors.extend(vectors)
-
-            logger.info(f"批量向量化完成: vector_count={len(all_vectors)}")
+            returned: set[bytes] = set()
+            for key in keys:
+                vector = vectors_by_key[key]
+                all_vectors.append(list(vector) if key in returned else vector)
+                returned.add(key)
+
+            logger.info(
+                f"批量向量化完成: vector_count={len(all_vectors)}, api_text_count={len(missing)}"
+            )
             return all_vectors
 
         except LLMException:
@@ -162,13 +429,20 @@ class EmbeddingService:
             logger.warning("查询文本为空")
             return []
 
+        cache_key = self._cache_key(query)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.debug(f"查询向量命中缓存: query_length={len(query)}")
+            return cached
+
         try:
             logger.debug(f"开始查询向量化: query_length={len(query)}")
 
-            vectors = await self._call_embedding_api([query])
+            vector = await self._coalesce_query(query)
+            self._cache_put(cache_key, vector)
 
-            logger.debug(f"查询向量化完成: vector_dim={len(vectors[0])}")
-            return vectors[0]
+            logger.debug(f"查询向量化完成: vector_dim={len(vector)}")
+            return vector
 
         except LLMException:
             raise
@@ -181,21 +455,8 @@ class EmbeddingService:
                 details={"query_length": len(query), "error": str(e)},
             ) from e
 
-    async def embed_single(self, text: str) -> list[float]:
-        """单个文本向量化（embed_query 的别名）。
-
-        为保持接口一致性，提供 embed_single 方法。
-
-        Args:
-            text: 文本内容
-
-        Returns:
-            文本向量
-
-        Raises:
-            LLMException: Embedding 调用失败
-        """
-        return await self.embed_query(text)
+    # 单个文本向量化（embed_query 的别名），为保持接口一致性提供
+    embed_single = embed_query
 
     @property
     def model(self) -> str:
@@ -218,16 +479,11 @@ class EmbeddingService:
         return 1024
 
 
-_embedding_service: EmbeddingService | None = None
-
-
+@lru_cache
 def get_embedding_service() -> EmbeddingService:
-    """获取 Embedding 服务单例实例。
+    """获取 Embedding 服务单例实例（带缓存）。
 
     Returns:
         EmbeddingService 实例
     """
-    global _embedding_service
-    if _embedding_service is None:
-        _embedding_service = EmbeddingService()
-    return _embedding_service
+    return EmbeddingService()
@@ -3,6 +3,8 @@
 使用 OpenCV Haar 级联分类器检测图片中的人脸。
 """
 
+import threading
+
 import cv2
 import numpy as np
 from loguru import logger
@@ -17,22 +19,33 @@ class FaceDetector:
             cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
         )
 
-    def detect_faces(self, image_bytes: bytes) -> list[tuple[int, int, int, int]]:
-        """检测图片中的人脸位置。
+    @staticmethod
+    def _decode_gray(image_bytes: bytes) -> np.ndarray | None:
+        """将图片字节直接解码为灰度图。
 
         Args:
             image_bytes: 图片字节数据
 
         Returns:
-            list[tuple]: 人脸位置列表 [(x, y, w, h), ...]
+            灰度图数组，解码失败返回 None
         """
         try:
             nparr = np.frombuffer(image_bytes, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            if img is None:
-                return []
+            return cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
+        except Exception as e:
+            logger.warning(f"图片解码失败: {e}")
+            return None
+
+    def detect_faces_ndarray(self, gray: np.ndarray) -> list[tuple[int, int, int, int]]:
+        """检测灰度图中的人脸位置。
+
+        Args:
+            gray: 已解码的灰度图数组
 
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        Returns:
+            list[tuple]: 人脸位置列表 [(x, y, w, h), ...]
+        """
+        try:
             faces = self.face_cascade.detectMultiScale(
                 gray,
                 scaleFactor=1.1,
@@ -44,6 +57,20 @@ class FaceDetector:
             logger.warning(f"人脸检测失败: {e}")
             return []
 
+    def detect_faces(self, image_bytes: bytes) -> list[tuple[int, int, int, int]]:
+        """检测图片中的人脸位置。
+
+        Args:
+            image_bytes: 图片字节数据
+
+        Returns:
+            list[tuple]: 人脸位置列表 [(x, y, w, h), ...]
+        """
+        gray = self._decode_gray(image_bytes)
+        if gray is None:
+            return []
+        return self.detect_faces_ndarray(gray)
+
     def get_face_score(self, image_bytes: bytes) -> float:
         """计算图片的人脸相似度得分。
 
@@ -57,16 +84,15 @@ class FaceDetector:
         Returns:
             float: 人脸相似度得分（0-100）
         """
-        faces = self.detect_faces(image_bytes)
-        if not faces:
+        gray = self._decode_gray(image_bytes)
+        if gray is None:
             return 0.0
 
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        if img is None:
+        faces = self.detect_faces_ndarray(gray)
+        if not faces:
             return 0.0
 
-        img_area = img.shape[0] * img.shape[1]
+        img_area = gray.shape[0] * gray.shape[1]
         max_face_area = max(w * h for (_, _, w, h) in faces)
         face_ratio = max_face_area / img_area if img_area > 0 else 0
 
@@ -92,6 +118,24 @@ class FaceDetector:
         return best_idx
 
 
+# 按线程缓存的检测器：级联分类器加载开销较大，
+# 且 CascadeClassifier 不保证线程安全，故每个线程各持有一个实例
+_thread_local = threading.local()
+
+
+def _get_detector() -> FaceDetector:
+    """获取当前线程的人脸检测器，首次调用时创建。
+
+    Returns:
+        FaceDetector: 当前线程复用的检测器实例
+    """
+    detector = getattr(_thread_local, "detector", None)
+    if detector is None:
+        detector = FaceDetector()
+        _thread_local.detector = detector
+    return detector
+
+
 def filter_avatar_images(images: list[bytes]) -> list[bytes]:
     """过滤图片，保留最可能是头像的那一张。
 
@@ -108,8 +152,7 @@ def filter_avatar_images(images: list[bytes]) -> list[bytes]:
     if len(images) <= 1:
         return images
 
-    detector = FaceDetector()
-    best_idx = detector.select_best_avatar(images)
+    best_idx = _get_detector().select_best_avatar(images)
 
     logger.info(f"人脸检测过滤: 从 {len(images)} 张图片中保留 1 张头像")
     return [images[best_idx]]
@@ -0,0 +1,270 @@
+"""Test embedding service batching behaviour."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from src.core.exceptions import LLMException
+from src.utils.embedding import EMBEDDING_BATCH_SIZE, EmbeddingService
+
+
+def _fake_vectors(texts: list[str]) -> list[list[float]]:
+    return [[float(len(text))] for text in texts]
+
+
+# 需要拆分为 3 个 API 批次的输入
+_LARGE_INPUT = [f"简历文本 {i}" for i in range(2 * EMBEDDING_BATCH_SIZE + 5)]
+
+
+@pytest.fixture
+def service():
+    return EmbeddingService()
+
+
+@pytest.fixture
+def mock_api(service):
+    with patch.object(
+        service, "_call_embedding_api", AsyncMock(side_effect=_fake_vectors)
+    ) as mock_call:
+        yield mock_call
+
+
+class TestEmbedQuery:
+    async def test_concurrent_queries_share_one_api_call(self, service, mock_api):
+        queries = [f"query-{'x' * i}" for i in range(8)]
+        vectors = await asyncio.gather(*(service.embed_query(q) for q in queries))
+
+        mock_api.assert_awaited_once_with(queries)
+        assert vectors == [[float(len(q))] for q in queries]
+
+    async def test_full_batch_flushes_without_waiting_for_window(self, service, mock_api):
+        service._query_batch_window = 10
+        queries = [f"q{i}" for i in range(EMBEDDING_BATCH_SIZE)]
+        await asyncio.wait_for(
+            asyncio.gather(*(service.embed_query(q) for q in queries)), timeout=1
+        )
+
+        mock_api.assert_awaited_once_with(queries)
+
+    async def test_query_arriving_during_flight_starts_new_batch(self, service, mock_api):
+        release = asyncio.Event()
+
+        async def slow_call(texts):
+            await release.wait()
+            return _fake_vectors(texts)
+
+        mock_api.side_effect = slow_call
+        first = asyncio.create_task(service.embed_query("a"))
+        await asyncio.sleep(0.05)
+        second = asyncio.create_task(service.embed_query("bb"))
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.wait_for(asyncio.gather(first, second), timeout=1)
+
+        assert results == [[1.0], [2.0]]
+        assert mock_api.await_count == 2
+
+    async def test_batch_failure_propagates_to_every_waiter(self, service, mock_api):
+        mock_api.side_effect = LLMException("boom", provider="dashscope")
+        results = await asyncio.gather(
+            service.embed_query("a"), service.embed_query("b"), return_exceptions=True
+        )
+
+        assert all(isinstance(r, LLMException) for r in results)
+
+    async def test_short_api_response_fails_every_waiter(self, service, mock_api):
+        mock_api.side_effect = None
+        mock_api.return_value = []
+
+        with pytest.raises(LLMException, match="数量不匹配"):
+            await asyncio.wait_for(service.embed_query("hello"), timeout=1)
+
+    async def test_duplicate_queries_in_batch_share_one_api_text(self, service, mock_api):
+        results = await asyncio.gather(
+            service.embed_query("a"), service.embed_query("a"), service.embed_query("bb")
+        )
+
+        mock_api.assert_awaited_once_with(["a", "bb"])
+        assert results == [[1.0], [1.0], [2.0]]
+        assert results[0] is not results[1]
+
+    async def test_cancelled_flush_releases_waiters(self, service, mock_api):
+        async def never_returns(texts):
+            await asyncio.Event().wait()
+
+        mock_api.side_effect = never_returns
+        query = asyncio.create_task(service.embed_query("a"))
+        await asyncio.sleep(0.05)
+        for task in service._flush_tasks:
+            task.cancel()
+
+        with pytest.raises(LLMException, match="已取消"):
+            await asyncio.wait_for(query, timeout=1)
+
+    async def test_empty_query_skips_api(self, service, mock_api):
+        assert await service.embed_query("") == []
+
+        mock_api.assert_not_awaited()
+
+    def test_embed_single_is_embed_query(self):
+        assert EmbeddingService.embed_single is EmbeddingService.embed_query
+
+
+class TestEmbeddingCache:
+    async def test_repeated_query_hits_cache(self, service, mock_api):
+        first = await service.embed_query("Python 工程师")
+        second = await service.embed_query("Python 工程师")
+
+        mock_api.assert_awaited_once()
+        assert first == second
+
+    async def test_cache_evicts_least_recently_used(self, service, mock_api):
+        service._cache_size = 2
+        for query in ["a", "bb", "a", "ccc", "a", "bb"]:
+            await service.embed_query(query)
+
+        assert mock_api.await_count == 4
+
+    async def test_cached_vector_round_trips_exactly(self, service, mock_api):
+        vector = [0.123456789012345, -1e-9, 3.5]
+        mock_api.side_effect = None
+        mock_api.return_value = [vector]
+        await service.embed_query("q")
+        cached = await service.embed_query("q")
+
+        assert cached == vector
+        cached.append(0.0)
+        assert await service.embed_query("q") == vector
+
+
+class TestEmbeddingHttpClient:
+    async def test_http_client_is_reused_until_closed(self, service):
+        client = service._get_http_client()
+
+        assert service._get_http_client() is client
+
+        await service.close()
+        assert client.is_closed
+        assert service._get_http_client() is not client
+        await service.close()
+
+
+class TestEmbedTexts:
+    async def test_only_uncached_texts_reach_api(self, service, mock_api):
+        await service.embed_query("bb")
+        vectors = await service.embed_texts(["a", "bb", "ccc", "a"])
+
+        assert mock_api.await_args_list[-1].args == (["a", "ccc"],)
+        assert vectors == [[1.0], [2.0], [3.0], [1.0]]
+
+    async def test_repeated_texts_get_independent_lists(self, service, mock_api):
+        vectors = await service.embed_texts(["a", "a"])
+
+        assert vectors == [[1.0], [1.0]]
+        assert vectors[0] is not vectors[1]
+
+    async def test_short_api_response_reports_vector_counts(self, service):
+        service._api_key = "test-api-key"
+        client = MagicMock()
+        client.post = AsyncMock(
+            return_value=httpx.Response(
+                200,
+                json={"data": [{"embedding": [0.1]}]},
+                request=httpx.Request("POST", "https://example.com/embeddings"),
+            )
+        )
+        with (
+            patch.object(service, "_get_http_client", return_value=client),
+            pytest.raises(LLMException, match="期望 2，实际 1"),
+        ):
+            await service.embed_texts(["a", "bb"])
+
+    async def test_large_input_split_into_api_sized_batches(self, service, mock_api):
+        vectors = await service.embed_texts(_LARGE_INPUT)
+
+        batch_sizes = [len(call.args[0]) for call in mock_api.await_args_list]
+        assert batch_sizes == [EMBEDDING_BATCH_SIZE, EMBEDDING_BATCH_SIZE, 5]
+        assert vectors == _fake_vectors(_LARGE_INPUT)
+
+    async def test_batches_are_sent_concurrently(self, service, mock_api):
+        release = asyncio.Event()
+        started = 0
+
+        async def blocking_call(batch):
+            nonlocal started
+            started += 1
+            await release.wait()
+            return _fake_vectors(batch)
+
+        mock_api.side_effect = blocking_call
+        task = asyncio.create_task(service.embed_texts(_LARGE_INPUT))
+        await asyncio.sleep(0.05)
+        assert started == 3
+        release.set()
+
+        assert await asyncio.wait_for(task, timeout=1) == _fake_vectors(_LARGE_INPUT)
+
+    async def test_failed_batch_cancels_remaining_batches(self, service, mock_api):
+        never = asyncio.Event()
+        cancelled = 0
+
+        async def failing_call(batch):
+            nonlocal cancelled
+            if batch[0] == _LARGE_INPUT[EMBEDDING_BATCH_SIZE]:
+                raise LLMException("boom", provider="dashscope")
+            try:
+                await never.wait()
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            return _fake_vectors(batch)
+
+        mock_api.side_effect = failing_call
+        with pytest.raises(LLMException, match="boom"):
+            await asyncio.wait_for(service.embed_texts(_LARGE_INPUT), timeout=1)
+
+        assert cancelled == 2
+
+
+class TestEmbeddingRetry:
+    @pytest.fixture(autouse=True)
+    def _configure_service(self, service):
+        service._api_key = "test-api-key"
+        service._max_retries = 2
+
+    @staticmethod
+    def _response() -> httpx.Response:
+        return httpx.Response(
+            200,
+            json={"data": [{"embedding": [0.1, 0.2]}]},
+            request=httpx.Request("POST", "https://example.com/embeddings"),
+        )
+
+    async def test_network_error_is_retried(self, service):
+        client = MagicMock()
+        client.post = AsyncMock(
+            side_effect=[httpx.ConnectError("reset"), httpx.ReadTimeout("slow"), self._response()]
+        )
+        with (
+            patch.object(service, "_get_http_client", return_value=client),
+            patch("src.utils.embedding.asyncio.sleep", AsyncMock()) as mock_sleep,
+        ):
+            vectors = await service._call_embedding_api(["text"])
+
+        assert vectors == [[0.1, 0.2]]
+        assert client.post.await_count == 3
+        assert [call.args[0] for call in mock_sleep.await_args_list] == [0.2, 0.4]
+
+    async def test_retries_exhausted_raise_llm_exception(self, service):
+        client = MagicMock()
+        client.post = AsyncMock(side_effect=httpx.ConnectError("down"))
+        with (
+            patch.object(service, "_get_http_client", return_value=client),
+            patch("src.utils.embedding.asyncio.sleep", AsyncMock()),
+            pytest.raises(LLMException),
+        ):
+            await service._call_embedding_api(["text"])
+
+        assert client.post.await_count == 3
@@ -0,0 +1,99 @@
+"""Test face detector decoding and avatar filtering."""
+
+import threading
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+import pytest
+
+from src.utils import face_detector
+from src.utils.face_detector import FaceDetector, filter_avatar_images
+
+
+def _encode_image(width: int, height: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    img = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    _, buffer = cv2.imencode(".png", img)
+    return buffer.tobytes()
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return FaceDetector()
+
+
+class TestFaceDetector:
+    def test_grayscale_decode_matches_color_conversion(self, detector):
+        image_bytes = _encode_image(120, 80)
+        color = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        assert color is not None
+        expected = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY)
+
+        gray = detector._decode_gray(image_bytes)
+
+        assert gray is not None
+        assert gray.shape == (80, 120)
+        assert np.abs(gray.astype(int) - expected.astype(int)).max() <= 1
+
+    def test_detect_faces_ndarray_takes_grayscale_directly(self, detector):
+        rng = np.random.default_rng(0)
+        gray = rng.integers(0, 256, size=(200, 200), dtype=np.uint8)
+        _, buffer = cv2.imencode(".png", gray)
+
+        with patch.object(FaceDetector, "_decode_gray") as decode:
+            faces = detector.detect_faces_ndarray(gray)
+        decode.assert_not_called()
+
+        assert faces == []
+        assert faces == detector.detect_faces(buffer.tobytes())
+
+    def test_undecodable_bytes(self, detector):
+        assert detector.detect_faces(b"not an image") == []
+        assert detector.get_face_score(b"not an image") == 0.0
+
+    def test_image_without_faces(self, detector):
+        image_bytes = _encode_image(200, 200)
+
+        assert detector.detect_faces(image_bytes) == []
+        assert detector.get_face_score(image_bytes) == 0.0
+
+
+class TestFilterAvatarImages:
+    def test_keeps_exactly_one_of_several_images(self):
+        images = [_encode_image(100 + i * 50, 100, seed=i) for i in range(3)]
+
+        result = filter_avatar_images(images)
+
+        assert len(result) == 1
+        assert result[0] in images
+
+    def test_keeps_the_highest_scoring_image(self):
+        images = [_encode_image(100, 100, seed=i) for i in range(3)]
+
+        with patch.object(FaceDetector, "get_face_score", side_effect=[10.0, 80.0, 30.0]):
+            result = filter_avatar_images(images)
+
+        assert result == [images[1]]
+
+    def test_single_image_is_returned_unchanged(self):
+        images = [_encode_image(100, 100)]
+
+        assert filter_avatar_images(images) == images
+
+    def test_detector_is_cached_per_thread(self, monkeypatch):
+        monkeypatch.setattr(face_detector, "_thread_local", threading.local())
+        images = [_encode_image(100, 100, seed=i) for i in range(2)]
+
+        with patch.object(face_detector, "FaceDetector", wraps=FaceDetector) as factory:
+            filter_avatar_images(images)
+            filter_avatar_images(images)
+            assert factory.call_count == 1
+
+            thread = threading.Thread(target=filter_avatar_images, args=(images,))
+            thread.start()
+            thread.join()
+            assert factory.call_count == 2
+
+            filter_avatar_images(images)
+            assert factory.call_count == 2
@@ -0,0 +1,71 @@
+"""Test JSON log record formatting on the orjson and stdlib paths."""
+
+from datetime import datetime
+from enum import Enum
+import json
+import math
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from src.core import logger as logger_module
+from src.core.logger import format_json_record
+
+
+class _Status(Enum):
+    ACTIVE = "active"
+
+
+def _record(**extra: Any) -> Any:
+    return {
+        "time": datetime(2024, 1, 15, 10, 30, 45),
+        "level": SimpleNamespace(name="INFO"),
+        "message": "简历解析完成",
+        "module": "parser",
+        "function": "parse",
+        "line": 42,
+        "process": SimpleNamespace(id=1),
+        "thread": SimpleNamespace(id=2),
+        "extra": extra,
+        "exception": None,
+    }
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(logger_module, "orjson", None)
+    elif logger_module.orjson is None:
+        pytest.skip("orjson 未安装")
+    return request.param
+
+
+class TestFormatJsonRecord:
+    def test_fields_and_extra_values(self, encoder):
+        record = _record(path=Path("/data/a.pdf"), status=_Status.ACTIVE, count=3)
+
+        data = json.loads(format_json_record(record))
+
+        assert data["timestamp"] == "2024-01-15T10:30:45"
+        assert data["message"] == "简历解析完成"
+        assert data["extra"] == {"path": "/data/a.pdf", "status": "active", "count": 3}
+
+    def test_non_string_keys_in_extra(self, encoder):
+        data = json.loads(format_json_record(_record(ids={1: "a"})))
+
+        assert data["extra"]["ids"] == {"1": "a"}
+
+    def test_nan_encoding_differs_between_paths(self, encoder):
+        data = json.loads(format_json_record(_record(score=math.nan)))
+
+        if encoder == "orjson":
+            assert data["extra"]["score"] is None
+        else:
+            assert math.isnan(data["extra"]["score"])
+
+    def test_oversized_int_falls_back_to_stdlib(self, encoder):
+        data = json.loads(format_json_record(_record(big=2**70)))
+
+        assert data["extra"]["big"] == 2**70
@@ -1,6 +1,8 @@
 import sys
 from unittest.mock import MagicMock, patch, AsyncMock
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
 # Mock MinIO Client BEFORE import to avoid connection error
 mock_minio_module = MagicMock()
 sys.modules["src.storage.minio_client"] = mock_minio_module
@@ -14,9 +16,7 @@ except ImportError:
     # But usually MinIO is the only one connecting on init
     pass
 
-import pytest
 
-@pytest.mark.asyncio
 async def test_load_and_merge_conditions_fix():
     # Mock data with integer IDs (simulating what comes from JSON)
     filter_config = {
@@ -42,7 +42,7 @@ async def test_load_and_merge_conditions_fix():
     mock_cond3.conditions = {"keywords": ["C++"]}
     
     # Mock session
-    mock_session = AsyncMock()
+    mock_session = AsyncMock(spec=AsyncSession)
     mock_result = MagicMock()
     # The code calls scalars().all()
     mock_result.scalars.return_value.all.return_value = [mock_cond1, mock_cond2, mock_cond3]